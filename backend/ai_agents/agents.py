@@ -1,6 +1,7 @@
 # Extensible AI agents with LangChain and MCP support
 
 from typing import Dict, Any, Optional, List
+import asyncio
 import os
 import logging
 from dataclasses import dataclass
@@ -212,28 +213,34 @@ Cite sources from your search results."""
         
         super().__init__(config, system_prompt)
         
-        # Store setup flag
+        # Store setup flag; lock keeps concurrent first calls from setting up MCP twice
         self._mcp_setup_done = False
+        self._mcp_setup_lock = asyncio.Lock()
     
     async def setup_web_search_mcp(self):
         # Setup web search MCP with auth token
         if self._mcp_setup_done:
             return
-            
-        mcp_token = os.getenv("CODEXHUB_MCP_AUTH_TOKEN")
-        if mcp_token and mcp_token != "dummy-key":
-            server_configs = {
-                "web-search": {
-                    "transport": "streamable_http",
-                    "url": "https://mcp.codexhub.ai/web/mcp",
-                    "headers": {"x-team-key": mcp_token}
+
+        async with self._mcp_setup_lock:
+            # Another caller may have finished setup while we waited
+            if self._mcp_setup_done:
+                return
+
+            mcp_token = os.getenv("CODEXHUB_MCP_AUTH_TOKEN")
+            if mcp_token and mcp_token != "dummy-key":
+                server_configs = {
+                    "web-search": {
+                        "transport": "streamable_http",
+                        "url": "https://mcp.codexhub.ai/web/mcp",
+                        "headers": {"x-team-key": mcp_token}
+                    }
                 }
-            }
-            await self.setup_mcp(server_configs)
-            self._mcp_setup_done = True
-            logger.info("Web search MCP configured")
-        else:
-            logger.warning("CODEXHUB_MCP_AUTH_TOKEN not found, web search disabled")
+                await self.setup_mcp(server_configs)
+                self._mcp_setup_done = True
+                logger.info("Web search MCP configured")
+            else:
+                logger.warning("CODEXHUB_MCP_AUTH_TOKEN not found, web search disabled")
     
     async def execute(self, prompt: str, use_tools: bool = True) -> AgentResponse:
         # Ensure MCP is setup before execution
@@ -262,28 +269,34 @@ Provide responses in a clear, structured format."""
         
         super().__init__(config, system_prompt)
         
-        # Store setup flag
+        # Store setup flag; lock keeps concurrent first calls from setting up MCP twice
         self._mcp_setup_done = False
+        self._mcp_setup_lock = asyncio.Lock()
     
     async def setup_image_mcp(self):
         # Setup image generation MCP with auth token
         if self._mcp_setup_done:
             return
-            
-        mcp_token = os.getenv("CODEXHUB_MCP_AUTH_TOKEN")
-        if mcp_token and mcp_token != "dummy-key":
-            server_configs = {
-                "image-generation": {
-                    "transport": "streamable_http",
-                    "url": "https://mcp.codexhub.ai/image/mcp",
-                    "headers": {"x-team-key": mcp_token}
+
+        async with self._mcp_setup_lock:
+            # Another caller may have finished setup while we waited
+            if self._mcp_setup_done:
+                return
+
+            mcp_token = os.getenv("CODEXHUB_MCP_AUTH_TOKEN")
+            if mcp_token and mcp_token != "dummy-key":
+                server_configs = {
+                    "image-generation": {
+                        "transport": "streamable_http",
+                        "url": "https://mcp.codexhub.ai/image/mcp",
+                        "headers": {"x-team-key": mcp_token}
+                    }
                 }
-            }
-            await self.setup_mcp(server_configs)
-            self._mcp_setup_done = True
-            logger.info("Image generation MCP configured")
-        else:
-            logger.warning("CODEXHUB_MCP_AUTH_TOKEN not found, image generation disabled")
+                await self.setup_mcp(server_configs)
+                self._mcp_setup_done = True
+                logger.info("Image generation MCP configured")
+            else:
+                logger.warning("CODEXHUB_MCP_AUTH_TOKEN not found, image generation disabled")
     
     async def execute(self, prompt: str, use_tools: bool = True) -> AgentResponse:
         # Ensure MCP is setup before execution
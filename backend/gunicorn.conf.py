@@ -0,0 +1,15 @@
+"""Gunicorn settings for running the API as multiple Uvicorn workers.
+
+Start from the backend directory with ``gunicorn server:app``; gunicorn picks
+this file up automatically. Each worker runs its own lifespan, so the Mongo
+client, bcrypt pool and agents are per-process.
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8001")
+workers = int(os.getenv("WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Heartbeat files on tmpfs so a slow disk can't make workers look hung
+worker_tmp_dir = "/dev/shm"
+keepalive = 30
@@ -1,40 +1,80 @@
 """FastAPI server exposing AI agent endpoints."""
 
+import asyncio
+import hashlib
+import hmac
 import logging
+import math
 import os
-import uuid
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import bcrypt
 import jwt
+import orjson
+import uuid6
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from pymongo import AsyncMongoClient, WriteConcern
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from starlette.middleware.cors import CORSMiddleware
 
-from ai_agents.agents import AgentConfig, ChatAgent, SearchAgent
+from ai_agents.agents import AgentConfig, AgentResponse, ChatAgent, SearchAgent
 
 
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / ".env")
+
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "WARNING").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
-ROOT_DIR = Path(__file__).parent
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
+# Encoded once so PyJWT doesn't re-encode the str key on every encode/decode
+_JWT_KEY = JWT_SECRET.encode()
 JWT_ALGORITHM = "HS256"
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Admission control for outbound LLM calls, per worker process
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+# Comma-separated list of allowed origins; "*" (the default) is only meant for development
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
+
+# Decoded JWT payloads keyed by token digest; entries past their own "exp" are ignored
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=30)
+# Successful (password, hash) verifications, keyed by an HMAC so plaintext is never held.
+# The cache is process-local, so its key is too; it shares nothing with the JWT secret.
+_PASSWORD_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_PASSWORD_CACHE_KEY = secrets.token_bytes(32)
+# Checked against when the username is unknown so login timing doesn't reveal which users exist
+_DUMMY_HASH = bcrypt.hashpw(secrets.token_hex(16).encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+# Static prompt preambles; kept identical across requests so the LLM provider can cache the prefix
+MOTIVATIONAL_SYSTEM_PROMPT = """You are a supportive and encouraging AI companion designed to provide motivation and positivity.
+Your goal is to uplift users with positive encouragement, practical advice, and daily motivation.
+Be empathetic, understanding, and always maintain an optimistic yet realistic tone.
+Keep responses concise but meaningful."""
+
+DAILY_QUOTE_PROMPT = """Generate a single inspiring and motivational quote.
+It should be uplifting, positive, and encouraging.
+Format: Just the quote itself, no attribution needed. Keep it concise and impactful."""
 
 security = HTTPBearer()
 
 
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: str(uuid6.uuid7()))
     client_name: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -102,13 +142,18 @@ class MotivationalChatResponse(BaseModel):
 
 
 class ChatMessage(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: str(uuid6.uuid7()))
     user_id: str
     message: str
     response: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+_CHAT_MESSAGE_PROJECTION = {"_id": 0, **{field: 1 for field in ChatMessage.model_fields}}
+_CHAT_LIST_ADAPTER = TypeAdapter(List[ChatMessage])
+_STATUS_LIST_ADAPTER = TypeAdapter(List[StatusCheck])
+
+
 class DailyQuoteResponse(BaseModel):
     success: bool
     quote: str
@@ -116,34 +161,73 @@ class DailyQuoteResponse(BaseModel):
     error: Optional[str] = None
 
 
-def _ensure_db(request: Request):
+def _app_state(request: Request, name: str):
     try:
-        return request.app.state.db
+        return getattr(request.app.state, name)
     except AttributeError as exc:  # pragma: no cover - defensive
         raise HTTPException(status_code=503, detail="Database not ready") from exc
 
 
-def _hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def _spawn_background(request: Request, coro, description: str) -> None:
+    # Hold a strong reference until the task finishes; lifespan drains the set on shutdown
+    tasks = request.app.state.background_tasks
+    task = asyncio.create_task(coro)
+    tasks.add(task)
+
+    def _on_done(done: asyncio.Task) -> None:
+        tasks.discard(done)
+        if not done.cancelled() and done.exception() is not None:
+            logger.error("Background %s failed", description, exc_info=done.exception())
+
+    task.add_done_callback(_on_done)
+
+
+async def _hash_password(request: Request, password: str) -> str:
+    # bcrypt releases the GIL, so running it on a worker thread keeps the event loop free
+    loop = asyncio.get_running_loop()
+    hashed = await loop.run_in_executor(
+        request.app.state.bcrypt_pool, bcrypt.hashpw, password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)
+    )
+    return hashed.decode()
 
 
-def _verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed.encode())
+async def _verify_password(request: Request, password: str, hashed: str) -> bool:
+    key = hmac.new(_PASSWORD_CACHE_KEY, password.encode() + hashed.encode(), hashlib.sha256).digest()
+    if key in _PASSWORD_CACHE:
+        return True
 
+    loop = asyncio.get_running_loop()
+    verified = await loop.run_in_executor(
+        request.app.state.bcrypt_pool, bcrypt.checkpw, password.encode(), hashed.encode()
+    )
+    if verified:
+        _PASSWORD_CACHE[key] = True
+    return verified
 
-def _create_token(user_id: str, username: str) -> str:
+
+def _create_token(user_id: str, username: str, now: Optional[datetime] = None) -> str:
+    if now is None:
+        now = datetime.now(timezone.utc)
     payload = {
         "user_id": user_id,
         "username": username,
-        "exp": datetime.now(timezone.utc).timestamp() + 86400 * 7,  # 7 days
+        "exp": int(now.timestamp()) + 604800,  # 7 days
     }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return jwt.encode(payload, _JWT_KEY, algorithm=JWT_ALGORITHM)
 
 
 async def _get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), request: Request = None):
+    token = credentials.credentials
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _TOKEN_CACHE.get(key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        _TOKEN_CACHE.pop(key, None)
+
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=[JWT_ALGORITHM])
+        _TOKEN_CACHE[key] = payload
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -152,32 +236,112 @@ async def _get_current_user(credentials: HTTPAuthorizationCredentials = Depends(
 
 
 def _get_agent_cache(request: Request) -> Dict[str, object]:
-    if not hasattr(request.app.state, "agent_cache"):
-        request.app.state.agent_cache = {}
     return request.app.state.agent_cache
 
 
-async def _get_or_create_agent(request: Request, agent_type: str):
-    cache = _get_agent_cache(request)
-    if agent_type in cache:
-        return cache[agent_type]
+def _get_agent(request: Request, agent_type: str):
+    # Agents are built once in lifespan; anything missing here is an unknown type
+    try:
+        return _get_agent_cache(request)[agent_type]
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown agent type '{agent_type}'")
+
+
+def _ai_busy_error() -> HTTPException:
+    # Retry-After must be a whole number of seconds; round up so clients never retry immediately
+    return HTTPException(
+        status_code=503,
+        detail="AI service is busy, please retry shortly",
+        headers={"Retry-After": str(max(1, math.ceil(LLM_QUEUE_TIMEOUT)))},
+    )
 
-    config: AgentConfig = request.app.state.agent_config
 
-    if agent_type == "search":
-        cache[agent_type] = SearchAgent(config)
-    elif agent_type == "chat":
-        cache[agent_type] = ChatAgent(config)
-    else:
-        raise HTTPException(status_code=400, detail=f"Unknown agent type '{agent_type}'")
+async def _execute_agent(request: Request, agent, prompt: str, **kwargs) -> AgentResponse:
+    # Bound in-flight LLM calls; shed load with 503 rather than queueing without limit
+    semaphore: asyncio.Semaphore = request.app.state.llm_semaphore
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise _ai_busy_error()
+
+    try:
+        return await agent.execute(prompt, **kwargs)
+    finally:
+        semaphore.release()
+
+
+async def _generate_daily_quote(request: Request, agent, today: date) -> AgentResponse:
+    state = request.app.state
+    result = await _execute_agent(request, agent, DAILY_QUOTE_PROMPT)
+    if result.success:
+        cached: Optional[Tuple[date, str]] = state.daily_quote
+        # A generation for an earlier day that finishes late must not replace a newer quote
+        if cached is None or cached[0] <= today:
+            state.daily_quote = (today, result.content)
+    return result
+
+
+def _daily_quote_task(request: Request, agent, today: date) -> asyncio.Task:
+    """Return today's in-flight generation task, starting one if none is running."""
+    state = request.app.state
+    inflight: Optional[Tuple[date, asyncio.Task]] = state.daily_quote_inflight
+    if inflight is not None and inflight[0] == today:
+        return inflight[1]
+
+    task = asyncio.create_task(_generate_daily_quote(request, agent, today))
+    state.daily_quote_inflight = (today, task)
+    # Tracked with the other background tasks so lifespan drains it on shutdown
+    state.background_tasks.add(task)
+
+    def _on_done(done: asyncio.Task) -> None:
+        state.background_tasks.discard(done)
+        if state.daily_quote_inflight is not None and state.daily_quote_inflight[1] is done:
+            state.daily_quote_inflight = None
+        # Retrieve the outcome so a failure nobody is still awaiting isn't reported as unhandled
+        if not done.cancelled():
+            done.exception()
+
+    task.add_done_callback(_on_done)
+    return task
+
+
+# Request dependencies are async so FastAPI resolves them on the event loop rather than in its threadpool
+async def _get_db(request: Request):
+    return _app_state(request, "db")
+
+
+async def _get_unacked_db(request: Request):
+    # w=0 handle for writes that don't need a server reply
+    return _app_state(request, "db_unacked")
 
-    return cache[agent_type]
+
+async def _get_chat_agent(request: Request) -> ChatAgent:
+    return _get_agent(request, "chat")
+
+
+async def _get_search_agent(request: Request) -> SearchAgent:
+    return _get_agent(request, "search")
+
+
+async def _ensure_unique_index(collection, field: str) -> None:
+    # Fails when existing documents already share a value, e.g. ones left by the old
+    # check-then-insert signup; keep the worker up and say how to fix it
+    try:
+        await collection.create_index(field, unique=True)
+    except OperationFailure as exc:
+        logger.error(
+            "Could not create unique index on %s.%s because existing documents share a value (%s). "
+            "Until the duplicates are removed, signup cannot reject duplicate %s values. "
+            "See 'Unique user indexes' in README.md for the one-time cleanup, then restart.",
+            collection.name,
+            field,
+            exc,
+            field,
+        )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    load_dotenv(ROOT_DIR / ".env")
-
     mongo_url = os.getenv("MONGO_URL")
     db_name = os.getenv("DB_NAME")
 
@@ -185,17 +349,37 @@ async def lifespan(app: FastAPI):
         missing = [name for name, value in {"MONGO_URL": mongo_url, "DB_NAME": db_name}.items() if not value]
         raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
 
-    client = AsyncIOMotorClient(mongo_url)
+    # Pool size is per worker process; total connections = MONGO_MAX_POOL_SIZE * WORKERS
+    client = AsyncMongoClient(mongo_url, maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")))
+    bcrypt_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bcrypt")
+    background_tasks: set = set()
 
     try:
         app.state.mongo_client = client
+        app.state.bcrypt_pool = bcrypt_pool
+        app.state.llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+        app.state.background_tasks = background_tasks
+        # One generated quote per UTC day, shared by all users. A miss starts a single generation
+        # task that every concurrent request awaits, so they share one LLM call and its outcome.
+        app.state.daily_quote = None
+        app.state.daily_quote_inflight = None
         app.state.db = client[db_name]
+        app.state.db_unacked = client.get_database(db_name, write_concern=WriteConcern(w=0))
+        await _ensure_unique_index(app.state.db.users, "username")
+        await _ensure_unique_index(app.state.db.users, "email")
+        await app.state.db.chat_messages.create_index([("user_id", 1), ("timestamp", -1)])
         app.state.agent_config = AgentConfig()
-        app.state.agent_cache = {}
+        app.state.agent_cache = {
+            "chat": ChatAgent(app.state.agent_config),
+            "search": SearchAgent(app.state.agent_config),
+        }
         logger.info("AI Agents API starting up")
         yield
     finally:
-        client.close()
+        if background_tasks:
+            await asyncio.gather(*background_tasks, return_exceptions=True)
+        bcrypt_pool.shutdown(wait=False)
+        await client.close()
         logger.info("AI Agents API shutdown complete")
 
 
@@ -203,6 +387,17 @@ app = FastAPI(
     title="AI Agents API",
     description="Minimal AI Agents API with LangGraph and MCP support",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    # Credentialed requests can't be combined with a wildcard origin
+    allow_credentials="*" not in CORS_ORIGINS,
+    allow_origins=CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=7200,
 )
 
 api_router = APIRouter(prefix="/api")
@@ -214,32 +409,28 @@ async def root():
 
 
 @api_router.post("/auth/signup", response_model=AuthResponse)
-async def signup(user: UserSignup, request: Request):
+async def signup(user: UserSignup, request: Request, db=Depends(_get_db)):
     try:
-        db = _ensure_db(request)
-
-        # Check if user exists
-        existing_user = await db.users.find_one({"username": user.username})
-        if existing_user:
-            return AuthResponse(success=False, message="Username already exists")
-
-        existing_email = await db.users.find_one({"email": user.email})
-        if existing_email:
-            return AuthResponse(success=False, message="Email already exists")
-
-        # Create user
-        user_id = str(uuid.uuid4())
+        # Create user; the unique indexes on username/email reject duplicates
+        now = datetime.now(timezone.utc)
+        user_id = str(uuid6.uuid7())
         user_doc = {
             "id": user_id,
             "username": user.username,
             "email": user.email,
-            "password": _hash_password(user.password),
-            "created_at": datetime.now(timezone.utc),
+            "password": await _hash_password(request, user.password),
+            "created_at": now,
         }
-        await db.users.insert_one(user_doc)
+        try:
+            await db.users.insert_one(user_doc)
+        except DuplicateKeyError as exc:
+            key_pattern = (exc.details or {}).get("keyPattern", {})
+            if "email" in key_pattern:
+                return AuthResponse(success=False, message="Email already exists")
+            return AuthResponse(success=False, message="Username already exists")
 
         # Generate token
-        token = _create_token(user_id, user.username)
+        token = _create_token(user_id, user.username, now=now)
 
         return AuthResponse(success=True, token=token, username=user.username, message="Account created successfully")
     except Exception as exc:
@@ -248,13 +439,14 @@ async def signup(user: UserSignup, request: Request):
 
 
 @api_router.post("/auth/login", response_model=AuthResponse)
-async def login(user: UserLogin, request: Request):
+async def login(user: UserLogin, request: Request, db=Depends(_get_db)):
     try:
-        db = _ensure_db(request)
-
         # Find user
         user_doc = await db.users.find_one({"username": user.username})
-        if not user_doc or not _verify_password(user.password, user_doc["password"]):
+        if user_doc is None:
+            await _verify_password(request, user.password, _DUMMY_HASH)
+            return AuthResponse(success=False, message="Invalid username or password")
+        if not await _verify_password(request, user.password, user_doc["password"]):
             return AuthResponse(success=False, message="Invalid username or password")
 
         # Generate token
@@ -267,36 +459,31 @@ async def login(user: UserLogin, request: Request):
 
 
 @api_router.post("/chat/motivational", response_model=MotivationalChatResponse)
-async def motivational_chat(chat_req: MotivationalChatRequest, request: Request, current_user: dict = Depends(_get_current_user)):
+async def motivational_chat(
+    chat_req: MotivationalChatRequest,
+    request: Request,
+    current_user: dict = Depends(_get_current_user),
+    db=Depends(_get_db),
+    agent: ChatAgent = Depends(_get_chat_agent),
+):
     try:
-        db = _ensure_db(request)
-
-        # Create motivational chat agent
-        agent = await _get_or_create_agent(request, "chat")
-
-        # System prompt for motivation
-        motivational_prompt = f"""You are a supportive and encouraging AI companion designed to provide motivation and positivity.
-Your goal is to uplift users with positive encouragement, practical advice, and daily motivation.
-Be empathetic, understanding, and always maintain an optimistic yet realistic tone.
-Keep responses concise but meaningful.
-
-User message: {chat_req.message}"""
-
         # Get AI response
-        result = await agent.execute(motivational_prompt)
+        result = await _execute_agent(request, agent, f"{MOTIVATIONAL_SYSTEM_PROMPT}\n\nUser message: {chat_req.message}")
 
         if not result.success:
             return MotivationalChatResponse(success=False, response="", error=result.error)
 
-        # Save to chat history
+        # Save to chat history; one timestamp shared by the stored message and the response
+        now = datetime.now(timezone.utc)
         chat_message = ChatMessage(
             user_id=current_user["user_id"],
             message=chat_req.message,
             response=result.content,
+            timestamp=now,
         )
-        await db.chat_messages.insert_one(chat_message.model_dump())
+        _spawn_background(request, db.chat_messages.insert_one(chat_message.model_dump()), "chat history insert")
 
-        return MotivationalChatResponse(success=True, response=result.content)
+        return MotivationalChatResponse(success=True, response=result.content, timestamp=now)
     except HTTPException:
         raise
     except Exception as exc:
@@ -305,15 +492,18 @@ User message: {chat_req.message}"""
 
 
 @api_router.get("/chat/history")
-async def get_chat_history(request: Request, current_user: dict = Depends(_get_current_user)):
+async def get_chat_history(current_user: dict = Depends(_get_current_user), db=Depends(_get_db)):
     try:
-        db = _ensure_db(request)
-
         messages = await db.chat_messages.find(
-            {"user_id": current_user["user_id"]}
+            {"user_id": current_user["user_id"]},
+            projection=_CHAT_MESSAGE_PROJECTION,
         ).sort("timestamp", -1).limit(50).to_list(50)
 
-        return {"success": True, "messages": [ChatMessage(**msg) for msg in messages]}
+        # Documents were validated by ChatMessage on insert, so skip re-validation
+        history = [ChatMessage.model_construct(**msg) for msg in messages]
+
+        # Serialize the list in one pydantic-core pass and splice it into the envelope as-is
+        return ORJSONResponse({"success": True, "messages": orjson.Fragment(_CHAT_LIST_ADAPTER.dump_json(history))})
     except HTTPException:
         raise
     except Exception as exc:
@@ -322,20 +512,26 @@ async def get_chat_history(request: Request, current_user: dict = Depends(_get_c
 
 
 @api_router.get("/daily-quote", response_model=DailyQuoteResponse)
-async def get_daily_quote(request: Request, current_user: dict = Depends(_get_current_user)):
+async def get_daily_quote(
+    request: Request,
+    current_user: dict = Depends(_get_current_user),
+    agent: ChatAgent = Depends(_get_chat_agent),
+):
     try:
-        agent = await _get_or_create_agent(request, "chat")
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        cached = request.app.state.daily_quote
+        if cached is not None and cached[0] == today:
+            return DailyQuoteResponse(success=True, quote=cached[1], timestamp=now)
 
-        quote_prompt = """Generate a single inspiring and motivational quote.
-It should be uplifting, positive, and encouraging.
-Format: Just the quote itself, no attribution needed. Keep it concise and impactful."""
-
-        result = await agent.execute(quote_prompt)
+        # Starter and joiners wait alike; the slot wait inside the task is already bounded by
+        # _execute_agent. shield: a disconnecting client must not cancel the shared generation.
+        result = await asyncio.shield(_daily_quote_task(request, agent, today))
 
         if not result.success:
-            return DailyQuoteResponse(success=False, quote="", error=result.error)
+            return DailyQuoteResponse(success=False, quote="", error=result.error, timestamp=now)
 
-        return DailyQuoteResponse(success=True, quote=result.content)
+        return DailyQuoteResponse(success=True, quote=result.content, timestamp=now)
     except HTTPException:
         raise
     except Exception as exc:
@@ -344,25 +540,25 @@ Format: Just the quote itself, no attribution needed. Keep it concise and impact
 
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate, request: Request):
-    db = _ensure_db(request)
+async def create_status_check(input: StatusCheckCreate, db=Depends(_get_unacked_db)):
     status_obj = StatusCheck(**input.model_dump())
     await db.status_checks.insert_one(status_obj.model_dump())
     return status_obj
 
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks(request: Request):
-    db = _ensure_db(request)
+async def get_status_checks(db=Depends(_get_db)):
     status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Validate and serialize the whole list in pydantic-core, bypassing response_model re-processing
+    validated = _STATUS_LIST_ADAPTER.validate_python(status_checks)
+    return Response(content=_STATUS_LIST_ADAPTER.dump_json(validated), media_type="application/json")
 
 
 @api_router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(chat_request: ChatRequest, request: Request):
     try:
-        agent = await _get_or_create_agent(request, chat_request.agent_type)
-        response = await agent.execute(chat_request.message)
+        agent = _get_agent(request, chat_request.agent_type)
+        response = await _execute_agent(request, agent, chat_request.message)
 
         return ChatResponse(
             success=response.success,
@@ -386,14 +582,17 @@ async def chat_with_agent(chat_request: ChatRequest, request: Request):
 
 
 @api_router.post("/search", response_model=SearchResponse)
-async def search_and_summarize(search_request: SearchRequest, request: Request):
+async def search_and_summarize(
+    search_request: SearchRequest,
+    request: Request,
+    search_agent: SearchAgent = Depends(_get_search_agent),
+):
     try:
-        search_agent = await _get_or_create_agent(request, "search")
         search_prompt = (
             f"Search for information about: {search_request.query}. "
             "Provide a comprehensive summary with key findings."
         )
-        result = await search_agent.execute(search_prompt, use_tools=True)
+        result = await _execute_agent(request, search_agent, search_prompt, use_tools=True)
 
         if result.success:
             metadata = result.metadata or {}
@@ -426,11 +625,11 @@ async def search_and_summarize(search_request: SearchRequest, request: Request):
 
 
 @api_router.get("/agents/capabilities")
-async def get_agent_capabilities(request: Request):
+async def get_agent_capabilities(
+    search_agent: SearchAgent = Depends(_get_search_agent),
+    chat_agent: ChatAgent = Depends(_get_chat_agent),
+):
     try:
-        search_agent = await _get_or_create_agent(request, "search")
-        chat_agent = await _get_or_create_agent(request, "chat")
-
         return {
             "success": True,
             "capabilities": {
@@ -446,11 +645,3 @@ async def get_agent_capabilities(request: Request):
 
 
 app.include_router(api_router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)